@@ -0,0 +1,55 @@
+# API Gateway - Response Cache
+# Small in-process TTL cache used in front of downstream service calls
+#
+# Purpose:
+# - Users commonly resubmit near-identical job descriptions against the
+#   same CV; caching the downstream response short-circuits the expensive
+#   LLM / vector calls entirely.
+# - Job description text is normalized (lowercased, whitespace collapsed)
+#   before keying so trivial rewordings still hit.
+#
+# Responsibilities:
+# - TTL + LRU bounded cache storage
+# - JD text normalization for cache keys
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize free text for cache keying (lowercase, collapse whitespace)."""
+    return _WS_RE.sub(" ", text.strip().lower())
+
+
+class TTLCache:
+    """Bounded in-process cache with per-entry expiry (LRU eviction)."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        if key in self._data:
+            self._data.move_to_end(key)
+        elif len(self._data) >= self.maxsize:
+            self._data.popitem(last=False)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._data.clear()
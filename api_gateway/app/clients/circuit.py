@@ -0,0 +1,45 @@
+# Circuit breaker for downstream service calls
+#
+# When a downstream service is down, every gateway request would
+# otherwise stack a full connect timeout. After fail_max consecutive
+# failures the circuit opens and calls fail fast (no network I/O) until
+# reset_timeout elapses; the next call then probes the service once and
+# either closes the circuit again or re-opens it.
+
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit is open and calls are failing fast."""
+
+
+class CircuitBreaker:
+    """Minimal consecutive-failure circuit breaker."""
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float = 0.0
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if the circuit is open (fail fast)."""
+        if self._failures < self.fail_max:
+            return
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            # Half-open: let one probe call through
+            self._failures = self.fail_max - 1
+            return
+        raise CircuitOpenError(
+            f"{self.name} circuit open after {self.fail_max} consecutive "
+            f"failures; failing fast"
+        )
+
+    def record_success(self) -> None:
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
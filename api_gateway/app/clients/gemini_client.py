@@ -12,31 +12,132 @@
 # - Handle connection errors and retries
 # - Parse responses
 
+import asyncio
+import gzip
+import hashlib
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import httpx
+import orjson
+
+from ..cache import TTLCache, normalize_text
+from .circuit import CircuitBreaker
 
 GEMINI_SERVICE_URL = os.getenv("GEMINI_SERVICE_URL", "http://localhost:8002")
 
+# Shared connection-pooled client (created lazily, reused across requests).
+# Opening a fresh AsyncClient per call pays a new TCP handshake every time;
+# keep-alive connections amortize that cost away.
+_client: Optional[httpx.AsyncClient] = None
+
+# Fail fast when GeminiService is down instead of stacking timeouts
+_breaker = CircuitBreaker("GeminiService")
+
+# Single-flight table: duplicate in-flight POSTs with an identical payload
+# coalesce onto one Future instead of each spawning a downstream call.
+_inflight: Dict[bytes, "asyncio.Future[Dict[str, Any]]"] = {}
+
 
 class GeminiClientError(Exception):
     """Custom exception for GeminiService errors."""
 
 
-async def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    url = f"{GEMINI_SERVICE_URL}{path}"
+# Response cache for the LLM-backed calls. Users resubmit near-identical
+# JDs against the same CV constantly ("tweak & rescore"); a hit here skips
+# the Gemini round-trip entirely. JD text is normalized before keying.
+_response_cache = TTLCache(maxsize=1024, ttl=3600.0)
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=GEMINI_SERVICE_URL,
+            timeout=30.0,
+            # retries=2 absorbs transient TCP resets at the transport
+            # level instead of failing the whole gateway request
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Bodies below this size aren't worth the compression round-trip
+_COMPRESS_THRESHOLD = 1024
+
+
+async def _send_post(path: str, content: bytes) -> Dict[str, Any]:
+    _breaker.check()
+    headers = {"content-type": "application/json"}
+    if len(content) > _COMPRESS_THRESHOLD:
+        # Large cv_text / chunks payloads compress ~5x; the internal
+        # services decompress transparently via GzipRequestMiddleware
+        content = gzip.compress(content, compresslevel=1)
+        headers["content-encoding"] = "gzip"
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(url, json=payload)
+        client = await get_client()
+        resp = await client.post(path, content=content, headers=headers)
     except httpx.RequestError as exc:
+        _breaker.record_failure()
         raise GeminiClientError(f"Error connecting to GeminiService: {exc}") from exc
 
+    if resp.status_code >= 500:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success()
     if resp.status_code >= 400:
         raise GeminiClientError(
             f"GeminiService returned {resp.status_code}: {resp.text}"
         )
-    return resp.json()
+    return orjson.loads(resp.content)
+
+
+async def _post(
+    path: str, payload: Dict[str, Any], content: Optional[bytes] = None
+) -> Dict[str, Any]:
+    # Serialize once; the same bytes feed the single-flight key, the
+    # cache digest upstream, and the request body
+    if content is None:
+        content = orjson.dumps(payload)
+    key = hashlib.blake2b(path.encode() + b"\x00" + content, digest_size=16).digest()
+
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return await inflight
+
+    future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _send_post(path, content)
+        future.set_result(result)
+        return result
+    except BaseException as exc:
+        if isinstance(exc, Exception):
+            future.set_exception(exc)
+            # Mark retrieved so lone flights don't warn on GC.
+            future.exception()
+        else:
+            future.cancel()
+        raise
+    finally:
+        _inflight.pop(key, None)
 
 
 async def structure_cv(cv_text: str) -> Dict[str, Any]:
@@ -48,28 +149,60 @@ async def structure_cv(cv_text: str) -> Dict[str, Any]:
     return await _post("/internal/structure_cv", payload)
 
 
-async def missing_keywords(jd_text: str, cv_id: str) -> Dict[str, Any]:
+async def _cached_post(
+    cache_key: tuple,
+    path: str,
+    payload: Dict[str, Any],
+    no_cache: bool,
+    content: Optional[bytes] = None,
+) -> Dict[str, Any]:
+    if not no_cache:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    result = await _post(path, payload, content=content)
+    if not no_cache:
+        _response_cache.set(cache_key, result)
+    return result
+
+
+async def missing_keywords(
+    jd_text: str, cv_id: str, no_cache: bool = False
+) -> Dict[str, Any]:
     """
     Call GeminiService to get missing keywords for a CV vs job description.
     Internal endpoint: POST /internal/missing_keywords
     """
-    payload = {"jd_text": jd_text, "cv_id": cv_id}
-    return await _post("/internal/missing_keywords", payload)
+    # no_cache is forwarded so the GeminiService-level LLM cache is
+    # bypassed too, not just the gateway's response cache
+    payload = {"jd_text": jd_text, "cv_id": cv_id, "no_cache": no_cache}
+    key = ("missing_keywords", cv_id, normalize_text(jd_text))
+    return await _cached_post(key, "/internal/missing_keywords", payload, no_cache)
 
 
-async def score(jd_text: str, cv_id: str) -> Dict[str, Any]:
+async def score(jd_text: str, cv_id: str, no_cache: bool = False) -> Dict[str, Any]:
     """
     Call GeminiService to get score + explanation for CV vs JD.
     Internal endpoint: POST /internal/score
     """
-    payload = {"jd_text": jd_text, "cv_id": cv_id}
-    return await _post("/internal/score", payload)
+    payload = {"jd_text": jd_text, "cv_id": cv_id, "no_cache": no_cache}
+    key = ("score", cv_id, normalize_text(jd_text))
+    return await _cached_post(key, "/internal/score", payload, no_cache)
 
 
-async def tailored_bullets(jd_text: str, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+async def tailored_bullets(
+    jd_text: str, chunks: List[Dict[str, Any]], no_cache: bool = False
+) -> Dict[str, Any]:
     """
     Call GeminiService to generate tailored bullet points.
     Internal endpoint: POST /internal/tailored_bullets
     """
     payload = {"jd_text": jd_text, "chunks": chunks}
-    return await _post("/internal/tailored_bullets", payload)
\ No newline at end of file
+    # One serialization covers the cache key, the single-flight key and
+    # the request body (chunks can be large, so avoid a second dumps)
+    content = orjson.dumps(payload)
+    body_digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    key = ("tailored_bullets", body_digest)
+    return await _cached_post(
+        key, "/internal/tailored_bullets", payload, no_cache, content=content
+    )
\ No newline at end of file
@@ -11,46 +11,138 @@
 # - Handle connection errors and retries
 # - Parse responses
 
+import asyncio
+import gzip
+import hashlib
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import httpx
+import orjson
+
+from .circuit import CircuitBreaker
 
 STORING_SERVICE_URL = os.getenv("STORING_SERVICE_URL", "http://localhost:8001")
 
+# Shared connection-pooled client (created lazily, reused across requests).
+_client: Optional[httpx.AsyncClient] = None
+
+# Fail fast when StoringService is down instead of stacking timeouts
+_breaker = CircuitBreaker("StoringService")
+
+# Single-flight table: duplicate in-flight POSTs with an identical payload
+# coalesce onto one Future instead of each spawning a downstream call.
+_inflight: Dict[bytes, "asyncio.Future[Dict[str, Any]]"] = {}
+
 
 class StoringClientError(Exception):
     """Custom exception for StoringService errors."""
 
 
-async def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    url = f"{STORING_SERVICE_URL}{path}"
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=STORING_SERVICE_URL,
+            timeout=15.0,
+            # retries=2 absorbs transient TCP resets at the transport
+            # level instead of failing the whole gateway request
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Bodies below this size aren't worth the compression round-trip
+_COMPRESS_THRESHOLD = 1024
+
+
+async def _send_post(path: str, content: bytes) -> Dict[str, Any]:
+    _breaker.check()
+    headers = {"content-type": "application/json"}
+    if len(content) > _COMPRESS_THRESHOLD:
+        # Large cv_text / chunks payloads compress ~5x; the internal
+        # services decompress transparently via GzipRequestMiddleware
+        content = gzip.compress(content, compresslevel=1)
+        headers["content-encoding"] = "gzip"
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.post(url, json=payload)
+        client = await get_client()
+        resp = await client.post(path, content=content, headers=headers)
     except httpx.RequestError as exc:
+        _breaker.record_failure()
         raise StoringClientError(f"Error connecting to StoringService: {exc}") from exc
 
+    if resp.status_code >= 500:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success()
     if resp.status_code >= 400:
         raise StoringClientError(
             f"StoringService returned {resp.status_code}: {resp.text}"
         )
-    return resp.json()
+    return orjson.loads(resp.content)
+
+
+async def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    content = orjson.dumps(payload)
+    key = hashlib.blake2b(path.encode() + b"\x00" + content, digest_size=16).digest()
+
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return await inflight
+
+    future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _send_post(path, content)
+        future.set_result(result)
+        return result
+    except BaseException as exc:
+        if isinstance(exc, Exception):
+            future.set_exception(exc)
+            # Mark retrieved so lone flights don't warn on GC.
+            future.exception()
+        else:
+            future.cancel()
+        raise
+    finally:
+        _inflight.pop(key, None)
 
 
 async def _get(path: str) -> Dict[str, Any]:
-    url = f"{STORING_SERVICE_URL}{path}"
+    _breaker.check()
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(url)
+        client = await get_client()
+        resp = await client.get(path)
     except httpx.RequestError as exc:
+        _breaker.record_failure()
         raise StoringClientError(f"Error connecting to StoringService: {exc}") from exc
 
+    if resp.status_code >= 500:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success()
     if resp.status_code >= 400:
         raise StoringClientError(
             f"StoringService returned {resp.status_code}: {resp.text}"
         )
-    return resp.json()
+    return orjson.loads(resp.content)
 
 
 async def store_cv(structured_cv: Dict[str, Any], cv_text: str, user_id: str) -> Dict[str, Any]:
@@ -10,31 +10,125 @@
 # - Handle connection errors and retries
 # - Parse responses
 
+import asyncio
+import gzip
+import hashlib
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, Optional
 
 import httpx
+import orjson
+
+from ..cache import TTLCache, normalize_text
+from .circuit import CircuitBreaker
 
 VECTOR_SERVICE_URL = os.getenv("VECTOR_SERVICE_URL", "http://localhost:8003")
 
+# Shared connection-pooled client (created lazily, reused across requests).
+_client: Optional[httpx.AsyncClient] = None
+
+# Fail fast when VectorService is down instead of stacking timeouts
+_breaker = CircuitBreaker("VectorService")
+
+# Single-flight table: duplicate in-flight POSTs with an identical payload
+# coalesce onto one Future instead of each spawning a downstream call.
+_inflight: Dict[bytes, "asyncio.Future[Dict[str, Any]]"] = {}
+
 
 class VectorClientError(Exception):
     """Custom exception for VectorService errors."""
 
 
-async def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    url = f"{VECTOR_SERVICE_URL}{path}"
+# Near-identical JDs resolve to the same ANN results; a short TTL keeps
+# results fresh as new CVs get embedded while skipping the VectorService
+# round-trip (and its ANN lookup) for repeat queries.
+_response_cache = TTLCache(maxsize=1024, ttl=300.0)
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=VECTOR_SERVICE_URL,
+            timeout=20.0,
+            # retries=2 absorbs transient TCP resets at the transport
+            # level instead of failing the whole gateway request
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Bodies below this size aren't worth the compression round-trip
+_COMPRESS_THRESHOLD = 1024
+
+
+async def _send_post(path: str, content: bytes) -> Dict[str, Any]:
+    _breaker.check()
+    headers = {"content-type": "application/json"}
+    if len(content) > _COMPRESS_THRESHOLD:
+        # Large cv_text / chunks payloads compress ~5x; the internal
+        # services decompress transparently via GzipRequestMiddleware
+        content = gzip.compress(content, compresslevel=1)
+        headers["content-encoding"] = "gzip"
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.post(url, json=payload)
+        client = await get_client()
+        resp = await client.post(path, content=content, headers=headers)
     except httpx.RequestError as exc:
+        _breaker.record_failure()
         raise VectorClientError(f"Error connecting to VectorService: {exc}") from exc
 
+    if resp.status_code >= 500:
+        _breaker.record_failure()
+    else:
+        _breaker.record_success()
     if resp.status_code >= 400:
         raise VectorClientError(
             f"VectorService returned {resp.status_code}: {resp.text}"
         )
-    return resp.json()
+    return orjson.loads(resp.content)
+
+
+async def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    content = orjson.dumps(payload)
+    key = hashlib.blake2b(path.encode() + b"\x00" + content, digest_size=16).digest()
+
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return await inflight
+
+    future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _send_post(path, content)
+        future.set_result(result)
+        return result
+    except BaseException as exc:
+        if isinstance(exc, Exception):
+            future.set_exception(exc)
+            # Mark retrieved so lone flights don't warn on GC.
+            future.exception()
+        else:
+            future.cancel()
+        raise
+    finally:
+        _inflight.pop(key, None)
 
 
 async def similar_chunks(jd_text: str) -> Dict[str, Any]:
@@ -42,8 +136,14 @@ async def similar_chunks(jd_text: str) -> Dict[str, Any]:
     Find similar chunks for the given job description.
     Internal endpoint: POST /internal/similar_chunks
     """
-    payload = {"jd_text": jd_text}
-    return await _post("/internal/similar_chunks", payload)
+    key = ("similar_chunks", normalize_text(jd_text))
+    cached = _response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await _post("/internal/similar_chunks", {"jd_text": jd_text})
+    _response_cache.set(key, result)
+    return result
 
 
 async def search_top_k_cvs(jd_text: str, top_k: int = 3) -> Dict[str, Any]:
@@ -51,5 +151,13 @@ async def search_top_k_cvs(jd_text: str, top_k: int = 3) -> Dict[str, Any]:
     Search top-k similar CVs for the given job description.
     Internal endpoint: POST /internal/search_top_k_cvs
     """
-    payload = {"jd_text": jd_text, "top_k": top_k}
-    return await _post("/internal/search_top_k_cvs", payload)
\ No newline at end of file
+    key = ("search_top_k_cvs", normalize_text(jd_text), top_k)
+    cached = _response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await _post(
+        "/internal/search_top_k_cvs", {"jd_text": jd_text, "top_k": top_k}
+    )
+    _response_cache.set(key, result)
+    return result
\ No newline at end of file
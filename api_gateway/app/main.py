@@ -6,15 +6,36 @@
 # - Configure CORS, middleware
 # - Health check endpoint
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from .clients import gemini_client, storing_client, vector_client
 from .routes import router as api_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the shared HTTP clients so the first request skips the handshake
+    await gemini_client.get_client()
+    await storing_client.get_client()
+    await vector_client.get_client()
+    yield
+    # Close shared HTTP clients and their pooled connections
+    await gemini_client.close_client()
+    await storing_client.close_client()
+    await vector_client.close_client()
+
+
 app = FastAPI(
     title="TailorCV API Gateway",
     version="0.1.0",
     description="Public API Gateway for TailorCV",
+    # orjson halves response serialization cost vs the stdlib encoder
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS – adjust origins later if you have a real frontend URL
@@ -16,10 +16,13 @@
 # - Combine responses from multiple services when needed
 # - Return formatted responses to client
 
+import asyncio
+import codecs
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 
 from .clients import gemini_client, storing_client, vector_client
 
@@ -28,15 +31,22 @@ router = APIRouter(tags=["public"])
 # --------- Pydantic models (public API contracts) ---------
 
 
+class PublicRequest(BaseModel):
+    """Base for inbound request bodies: strip strings, drop unknown keys."""
+
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+
 class AttachCvResponse(BaseModel):
     status: str = "success"
     cv_id: str = Field(..., description="Identifier of stored CV")
     message: str = "CV uploaded"
 
 
-class KeywordsRequest(BaseModel):
+class KeywordsRequest(PublicRequest):
     jd_text: str
     cv_id: str
+    no_cache: bool = False
 
 
 class KeywordsResponse(BaseModel):
@@ -44,9 +54,10 @@ class KeywordsResponse(BaseModel):
     explanation: Optional[str] = None
 
 
-class ScoreRequest(BaseModel):
+class ScoreRequest(PublicRequest):
     jd_text: str
     cv_id: str
+    no_cache: bool = False
 
 
 class ScoreResponse(BaseModel):
@@ -54,7 +65,7 @@ class ScoreResponse(BaseModel):
     explanation: str
 
 
-class SimilarCvsRequest(BaseModel):
+class SimilarCvsRequest(PublicRequest):
     jd_text: str
     top_k: int = 3
 
@@ -68,22 +79,74 @@ class SimilarCvsResponse(BaseModel):
     results: List[SimilarCvItem]
 
 
-class TailoredPointsRequest(BaseModel):
+class TailoredPointsRequest(PublicRequest):
     jd_text: str
     # optional: directly pass chunks (if you already have them)
     chunks: Optional[List[Dict[str, Any]]] = None
+    no_cache: bool = False
 
 
 class TailoredPointsResponse(BaseModel):
     bullet_points: List[str]
 
 
+class AnalyzeRequest(PublicRequest):
+    jd_text: str
+    cv_id: str
+    no_cache: bool = False
+
+
+class AnalyzeResponse(BaseModel):
+    score: float
+    explanation: str
+    missing_keywords: List[str]
+
+
 class MyCvResponse(BaseModel):
     cv_id: str
     structured_cv: Dict[str, Any]
     created_at: Optional[str] = None
 
 
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def _decode_upload(upload: UploadFile) -> str:
+    """
+    Stream-decode an uploaded text file without materializing the whole
+    byte payload first; the incremental decoder handles UTF-8 sequences
+    split across chunk boundaries.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")("ignore")
+    parts: List[str] = []
+    while True:
+        chunk = await upload.read(_UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def _extract_pdf_text(pdf_file) -> str:
+    """
+    Extract text from a PDF upload, page by page.
+    Takes the upload's file-like directly (PdfReader seeks it), avoiding
+    an extra in-memory copy. Collects page texts in a list and joins once
+    at the end; repeated `+=` on str is quadratic for large PDFs. Runs in
+    a worker thread (PyPDF2 is sync) so it never blocks the event loop.
+    """
+    # Lazy import: only PDF uploads pay the PyPDF2 import, and workers
+    # skip it entirely at boot
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(pdf_file)
+    parts: List[str] = []
+    for page in reader.pages:
+        parts.append(page.extract_text() or "")
+    return "\n".join(parts)
+
+
 # --------- Routes ---------
 
 
@@ -106,8 +169,11 @@ async def attach_cv(
 
     # Resolve CV text
     if cv_file is not None:
-        raw_bytes = await cv_file.read()
-        resolved_text = raw_bytes.decode("utf-8", errors="ignore")
+        filename = (cv_file.filename or "").lower()
+        if filename.endswith(".pdf") or cv_file.content_type == "application/pdf":
+            resolved_text = await asyncio.to_thread(_extract_pdf_text, cv_file.file)
+        else:
+            resolved_text = await _decode_upload(cv_file)
     else:
         resolved_text = (cv_text or "").strip()
 
@@ -161,7 +227,7 @@ async def get_missing_keywords(body: KeywordsRequest):
     """
     try:
         result = await gemini_client.missing_keywords(
-            jd_text=body.jd_text, cv_id=body.cv_id
+            jd_text=body.jd_text, cv_id=body.cv_id, no_cache=body.no_cache
         )
     except Exception as e:
         raise HTTPException(
@@ -181,7 +247,9 @@ async def score_cv(body: ScoreRequest):
     Score a CV vs job description.
     """
     try:
-        result = await gemini_client.score(jd_text=body.jd_text, cv_id=body.cv_id)
+        result = await gemini_client.score(
+            jd_text=body.jd_text, cv_id=body.cv_id, no_cache=body.no_cache
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
@@ -194,6 +262,36 @@ async def score_cv(body: ScoreRequest):
     )
 
 
+@router.post("/analyze", response_model=AnalyzeResponse)
+async def analyze_cv(body: AnalyzeRequest):
+    """
+    Score a CV and get its missing keywords in one request.
+    The two GeminiService calls are independent, so fan them out
+    concurrently instead of awaiting them back to back.
+    """
+    score_result, keywords_result = await asyncio.gather(
+        gemini_client.score(
+            jd_text=body.jd_text, cv_id=body.cv_id, no_cache=body.no_cache
+        ),
+        gemini_client.missing_keywords(
+            jd_text=body.jd_text, cv_id=body.cv_id, no_cache=body.no_cache
+        ),
+        return_exceptions=True,
+    )
+    for result in (score_result, keywords_result):
+        if isinstance(result, Exception):
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"GeminiService error: {result}",
+            )
+
+    return AnalyzeResponse(
+        score=score_result.get("score", 0.0),
+        explanation=score_result.get("explanation", ""),
+        missing_keywords=keywords_result.get("missing_keywords", []),
+    )
+
+
 @router.post("/similar_cvs", response_model=SimilarCvsResponse)
 async def similar_cvs(body: SimilarCvsRequest):
     """
@@ -235,7 +333,7 @@ async def tailored_points(body: TailoredPointsRequest):
 
     try:
         result = await gemini_client.tailored_bullets(
-            jd_text=body.jd_text, chunks=chunks
+            jd_text=body.jd_text, chunks=chunks, no_cache=body.no_cache
         )
     except Exception as e:
         raise HTTPException(
@@ -243,9 +341,9 @@ async def tailored_points(body: TailoredPointsRequest):
             detail=f"GeminiService error: {e}",
         )
 
-    return TailoredPointsResponse(
-        bullet_points=result.get("bullet_points", []),
-    )
+    # Pass-through: the payload was already validated downstream, so skip
+    # the Pydantic re-serialization and return pre-encoded JSON
+    return ORJSONResponse(content={"bullet_points": result.get("bullet_points", [])})
 
 
 @router.get("/my_cv", response_model=MyCvResponse)
@@ -270,10 +368,14 @@ async def my_cv():
             detail="Invalid latest CV data from StoringService.",
         )
 
-    return MyCvResponse(
-        cv_id=cv_id,
-        structured_cv=structured_cv,
-        created_at=latest.get("created_at"),
+    # Pass-through: structured_cv came straight from StoringService, so
+    # return it pre-encoded instead of re-validating the whole document
+    return ORJSONResponse(
+        content={
+            "cv_id": cv_id,
+            "structured_cv": structured_cv,
+            "created_at": latest.get("created_at"),
+        }
     )
 
 
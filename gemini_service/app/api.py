@@ -1,6 +1,9 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.service import structure_cv
+from app.service import structure_cv, find_missing_keywords, calculate_score
+from app.storing_client import StoringClientError
 
 router = APIRouter()
 
@@ -11,6 +14,13 @@ class StructureCVResponse(BaseModel):
     metadata: dict
     structured_sections: dict
 
+class AnalyzeRequest(BaseModel):
+    jd_text: str
+    cv_id: str
+    # Forwarded by the gateway's public no_cache flag; bypasses the
+    # service-level LLM cache so the flag holds end to end
+    no_cache: bool = False
+
 @router.post("/internal/structure_cv", response_model=StructureCVResponse)
 async def structure_cv_endpoint(request: StructureCVRequest):
     """
@@ -23,10 +33,58 @@ async def structure_cv_endpoint(request: StructureCVRequest):
         metadata and structured_sections
     """
     try:
-        result = structure_cv(request.cv_text)
+        # structure_cv blocks on the Gemini API; run it in a worker thread
+        # so the event loop stays free for other requests
+        result = await asyncio.to_thread(structure_cv, request.cv_text)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to structure CV: {str(e)}")
 
+@router.post("/internal/missing_keywords")
+async def missing_keywords_endpoint(request: AnalyzeRequest):
+    """
+    Find job-description keywords missing from a stored CV
+
+    Args:
+        jd_text: Job description text
+        cv_id: ID of a CV stored in StoringService
+
+    Returns:
+        missing_keywords list and explanation
+    """
+    try:
+        return await find_missing_keywords(
+            request.jd_text, request.cv_id, request.no_cache
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StoringClientError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to find missing keywords: {str(e)}")
+
+@router.post("/internal/score")
+async def score_endpoint(request: AnalyzeRequest):
+    """
+    Score a stored CV against a job description
+
+    Args:
+        jd_text: Job description text
+        cv_id: ID of a CV stored in StoringService
+
+    Returns:
+        score (0-100) and explanation
+    """
+    try:
+        return await calculate_score(
+            request.jd_text, request.cv_id, request.no_cache
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StoringClientError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to calculate score: {str(e)}")
+
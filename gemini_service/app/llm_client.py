@@ -1,22 +1,49 @@
+import copy
 import os
-import json
-import google.generativeai as genai
-from dotenv import load_dotenv
+import re
+import time
+import orjson
 
-load_dotenv()
+# .env loading is only needed when the key isn't already in the process
+# environment (e.g. local dev); skip the dotenv import entirely otherwise
+if not os.getenv('GEMINI_API_KEY'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Matches a full ```/```json fenced block in one pass, without splitting
+# the whole response into a list of lines
+_FENCE_RE = re.compile(r"^```(?:json)?\s*\n(.*)\n```\s*$", re.DOTALL)
+
+# Module-level model singleton; GenerativeModel is thread-safe for
+# generate calls, so one instance serves all requests
+_MODEL = None
 
 def initialize_gemini():
-    """Initialize Gemini API with API key from environment"""
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not found in environment variables")
-    
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-2.5-flash')
+    """Initialize Gemini API once and reuse the model across requests"""
+    global _MODEL
+    if _MODEL is None:
+        # Imported here so workers don't pay the heavy SDK import at boot;
+        # only the first real request loads it
+        import google.generativeai as genai
 
-def create_parsing_prompt(cv_text: str) -> str:
-    """Create the intelligent parsing prompt for Gemini"""
-    return f"""
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+        genai.configure(api_key=api_key)
+        # JSON mode: the model is constrained to emit valid JSON, which
+        # removes the malformed-output re-call path (a major source of
+        # tail latency). The fence-stripping fallback in generate_json
+        # stays as a belt-and-braces guard.
+        _MODEL = genai.GenerativeModel(
+            'gemini-2.5-flash',
+            generation_config={"response_mime_type": "application/json"},
+        )
+    return _MODEL
+
+# Static halves of the parsing prompt, built once at import time so each
+# request only pays a single join instead of rebuilding the ~2KB template
+_PROMPT_PREFIX = """
 You are an expert CV parser. Parse this CV and extract ALL information into structured JSON.
 
 IMPORTANT INSTRUCTIONS:
@@ -52,26 +79,28 @@ IMPORTANT INSTRUCTIONS:
 6. For dates, normalize to "Mon YYYY" format (e.g., "May 2024", "Present")
 
 CV TEXT TO PARSE:
-{cv_text}
+"""
+
+_PROMPT_SUFFIX = """
 
 Return ONLY valid JSON (no markdown, no code blocks, no explanation) with this EXACT structure:
-{{
-  "contact": {{
+{
+  "contact": {
     "name": "full name or null",
     "email": "email or null",
     "phone": "phone or null",
     "linkedin": "linkedin url or null",
     "github": "github url or null",
     "website": "website url or null"
-  }},
+  },
   
-  "summary": {{
+  "summary": {
     "text": "professional summary text or null",
     "key_highlights": []
-  }},
+  },
   
   "education": [
-    {{
+    {
       "institution": "university/college name",
       "degree": "degree name or null",
       "field": "field of study or null",
@@ -79,11 +108,11 @@ Return ONLY valid JSON (no markdown, no code blocks, no explanation) with this E
       "end_date": "end date or null",
       "gpa": "GPA or null",
       "honors": []
-    }}
+    }
   ],
   
   "experience": [
-    {{
+    {
       "company": "company name",
       "title": "job title",
       "location": "location or null",
@@ -91,10 +120,10 @@ Return ONLY valid JSON (no markdown, no code blocks, no explanation) with this E
       "end_date": "end date or 'Present' or null",
       "bullets": ["full bullet point text"],
       "technologies": ["tech extracted from bullets"]
-    }}
+    }
   ],
   
-  "skills": {{
+  "skills": {
     "languages": [],
     "frameworks": [],
     "cloud": [],
@@ -102,58 +131,58 @@ Return ONLY valid JSON (no markdown, no code blocks, no explanation) with this E
     "databases": [],
     "tools": [],
     "other": []
-  }},
+  },
   
   "certifications": [
-    {{
+    {
       "name": "certification name",
       "issuer": "issuing organization or null",
       "date": "date obtained or null",
       "credential_id": "credential ID or null"
-    }}
+    }
   ],
   
   "projects": [
-    {{
+    {
       "name": "project name",
       "description": "brief description or null",
       "technologies": [],
       "link": "project link or null",
       "start_date": "start date or null",
       "end_date": "end date or null"
-    }}
+    }
   ],
   
   "leadership": [
-    {{
+    {
       "role": "leadership role title",
       "organization": "organization name",
       "start_date": "start date or null",
       "end_date": "end date or null",
       "description": "brief description or null"
-    }}
+    }
   ],
   
   "publications": [
-    {{
+    {
       "title": "publication title",
       "venue": "conference/journal or null",
       "date": "publication date or null",
       "link": "publication link or null"
-    }}
+    }
   ],
   
   "awards": [
-    {{
+    {
       "name": "award name",
       "issuer": "issuing organization or null",
       "date": "date received or null"
-    }}
+    }
   ],
   
-  "additional_sections": {{
-  }}
-}}
+  "additional_sections": {
+  }
+}
 
 CRITICAL RULES:
 1. Return ONLY the JSON object, no markdown formatting, no ```json```, no explanation text
@@ -164,6 +193,56 @@ CRITICAL RULES:
 6. Extract technologies mentioned in experience descriptions
 """
 
+def create_parsing_prompt(cv_text: str) -> str:
+    """Create the intelligent parsing prompt for Gemini"""
+    return "".join((_PROMPT_PREFIX, cv_text, _PROMPT_SUFFIX))
+
+def _is_transient(error: Exception) -> bool:
+    """Heuristic check for retryable Gemini API failures (rate limit / 5xx)"""
+    message = str(error)
+    return any(marker in message for marker in ('429', '500', '503', 'Deadline', 'quota'))
+
+def generate_with_retry(model, prompt: str, max_retries: int = 3) -> str:
+    """
+    Call model.generate_content with exponential backoff on transient errors
+
+    A transient 429/5xx would otherwise tie up a gateway connection for the
+    full client timeout; retrying here absorbs it in a few seconds instead.
+
+    The call streams: chunks are drained as the model emits them, so a
+    mid-generation failure (quota, deadline) surfaces after seconds
+    instead of after the full-generation timeout, and the retry restarts
+    that much sooner.
+    """
+    delay = 1.0
+    for attempt in range(max_retries):
+        try:
+            response = model.generate_content(prompt, stream=True)
+            parts = []
+            for chunk in response:
+                if chunk.parts:
+                    parts.append(chunk.text)
+            return "".join(parts)
+        except Exception as e:
+            if attempt == max_retries - 1 or not _is_transient(e):
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+def generate_json(prompt: str) -> dict:
+    """Run a prompt through Gemini and parse the JSON response"""
+    model = initialize_gemini()
+    response_text = generate_with_retry(model, prompt).strip()
+
+    # Clean up response (remove markdown fence if present)
+    fence_match = _FENCE_RE.match(response_text)
+    if fence_match:
+        response_text = fence_match.group(1)
+
+    # Parse JSON (orjson is several times faster than stdlib json on the
+    # large nested CV payloads Gemini returns)
+    return orjson.loads(response_text)
+
 def call_gemini_to_structure_cv(cv_text: str) -> dict:
     """
     Call Gemini API to structure CV text into JSON
@@ -174,65 +253,82 @@ def call_gemini_to_structure_cv(cv_text: str) -> dict:
     Returns:
         Dictionary with structured CV sections
     """
-    model = initialize_gemini()
-    prompt = create_parsing_prompt(cv_text)
-    
-    response = model.generate_content(prompt)
-    response_text = response.text.strip()
-    
-    # Clean up response (remove markdown if present)
-    if response_text.startswith('```'):
-        lines = response_text.split('\n')
-        response_text = '\n'.join(lines[1:-1])
-        if response_text.startswith('json'):
-            response_text = response_text[4:].strip()
-    
-    # Parse JSON
-    structured_data = json.loads(response_text)
+    structured_data = generate_json(create_parsing_prompt(cv_text))
     
     # Validate and clean
     validated_data = validate_and_clean(structured_data)
     
     return validated_data
 
+_ANALYSIS_PROMPT = """
+You are an expert CV analyst. Analyze this CV against the job description.
+
+JOB DESCRIPTION:
+{jd_text}
+
+CV (structured JSON):
+{cv_json}
+
+Return ONLY valid JSON (no markdown, no code blocks) with this structure:
+{{
+  "score": 72.5,
+  "score_explanation": "one short paragraph justifying the 0-100 score",
+  "matched_keywords": ["keyword the CV already covers"],
+  "missing_keywords": ["important JD keyword absent from the CV"],
+  "keywords_explanation": "one short paragraph on the biggest gaps"
+}}
+"""
+
+def call_gemini_for_full_analysis(structured_sections: dict, jd_text: str) -> dict:
+    """
+    Score the CV and find missing JD keywords in one Gemini call
+
+    Both analyses need the same structured_sections + JD context, so one
+    combined call halves tokens and LLM round-trips for the common
+    "run both" flow; callers project out the fields they need.
+    """
+    prompt = _ANALYSIS_PROMPT.format(
+        jd_text=jd_text, cv_json=orjson.dumps(structured_sections).decode()
+    )
+    result = generate_json(prompt)
+    return {
+        "score": float(result.get("score", 0.0)),
+        "score_explanation": result.get("score_explanation", ""),
+        "matched_keywords": result.get("matched_keywords", []),
+        "missing_keywords": result.get("missing_keywords", []),
+        "keywords_explanation": result.get("keywords_explanation", ""),
+    }
+
+_DEFAULT_CV = {
+    'contact': {},
+    'summary': {"text": None, "key_highlights": []},
+    'education': [],
+    'experience': [],
+    'skills': {},
+    'certifications': [],
+    'projects': [],
+    'leadership': [],
+    'publications': [],
+    'awards': [],
+    'additional_sections': {}
+}
+
+_SKILL_DEFAULTS = {
+    "languages": [], "frameworks": [], "cloud": [],
+    "devops": [], "databases": [], "tools": [], "other": []
+}
+
 def validate_and_clean(data: dict) -> dict:
     """Validate and clean the Gemini output"""
-    required_keys = [
-        'contact', 'summary', 'education', 'experience',
-        'skills', 'certifications', 'projects', 'leadership',
-        'publications', 'awards', 'additional_sections'
-    ]
-    
-    for key in required_keys:
+    # Fill missing keys from the default template in one dict-driven pass
+    # (fresh copies so callers can't mutate the template), then drop empty
+    # skill categories
+    for key, default in _DEFAULT_CV.items():
         if key not in data:
-            if key in ['education', 'experience', 'certifications', 'projects',
-                      'leadership', 'publications', 'awards']:
-                data[key] = []
-            elif key == 'contact':
-                data[key] = {}
-            elif key == 'summary':
-                data[key] = {"text": None, "key_highlights": []}
-            elif key == 'skills':
-                data[key] = {
-                    "languages": [], "frameworks": [], "cloud": [],
-                    "devops": [], "databases": [], "tools": [], "other": []
-                }
-            elif key == 'additional_sections':
-                data[key] = {}
-    
-    # Ensure skills has all categories
-    if 'skills' in data:
-        skill_categories = ['languages', 'frameworks', 'cloud', 'devops',
-                          'databases', 'tools', 'other']
-        for category in skill_categories:
-            if category not in data['skills']:
-                data['skills'][category] = []
-    
-    # Remove empty skill categories
-    if 'skills' in data:
-        data['skills'] = {
-            k: v for k, v in data['skills'].items() if v
-        }
-    
+            data[key] = copy.deepcopy(default)
+
+    skills = {**_SKILL_DEFAULTS, **(data.get('skills') or {})}
+    data['skills'] = {k: v for k, v in skills.items() if v}
+
     return data
 
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from app.api import router
+from app.middleware import GzipRequestMiddleware
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,6 +11,8 @@ app = FastAPI(
     version="1.0.0"
 )
 
+app.add_middleware(GzipRequestMiddleware)
+
 app.include_router(router)
 
 @app.get("/health")
@@ -0,0 +1,45 @@
+import gzip
+
+class GzipRequestMiddleware:
+    """
+    Transparently decompress gzip-encoded request bodies
+
+    The API Gateway compresses large internal payloads (cv_text, chunks)
+    before sending them; this middleware restores the plain JSON body so
+    the route handlers never know the difference.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            if headers.get(b"content-encoding") == b"gzip":
+                chunks = []
+                more_body = True
+                while more_body:
+                    message = await receive()
+                    chunks.append(message.get("body", b""))
+                    more_body = message.get("more_body", False)
+                body = gzip.decompress(b"".join(chunks))
+
+                scope = dict(scope)
+                scope["headers"] = [
+                    (name, value)
+                    for name, value in scope["headers"]
+                    if name not in (b"content-encoding", b"content-length")
+                ] + [(b"content-length", str(len(body)).encode())]
+
+                delivered = False
+
+                async def wrapped_receive():
+                    nonlocal delivered
+                    if not delivered:
+                        delivered = True
+                        return {"type": "http.request", "body": body, "more_body": False}
+                    return await receive()
+
+                await self.app(scope, wrapped_receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -1,5 +1,43 @@
-from datetime import datetime
-from app.llm_client import call_gemini_to_structure_cv
+import asyncio
+import hashlib
+import re
+import time
+from datetime import datetime, timezone
+from app.llm_client import (
+    call_gemini_to_structure_cv,
+    call_gemini_for_full_analysis,
+)
+from app.storing_client import aget_cv
+
+_SECTION_KEYWORDS = (
+    'education', 'experience', 'skills', 'projects',
+    'certifications', 'awards', 'leadership', 'summary'
+)
+
+# One case-insensitive pass over the CV instead of lowercasing the full
+# text once per keyword and scanning it eight times
+_SECTION_RE = re.compile(r'\b(' + '|'.join(_SECTION_KEYWORDS) + r')\b', re.IGNORECASE)
+
+_TOKEN_RE = re.compile(r'\S+')
+
+def scan_cv(cv_text: str) -> tuple:
+    """
+    Single pass over the CV computing all metadata counts together
+
+    len() + split() + a separate keyword scan traversed the text three
+    times and split() materialized every word as a list entry; one
+    finditer walk counts words and spots section keywords as it goes.
+
+    Returns:
+        (character_count, word_count, sections_detected)
+    """
+    word_count = 0
+    sections_seen = set()
+    for token_match in _TOKEN_RE.finditer(cv_text):
+        word_count += 1
+        for keyword in _SECTION_RE.findall(token_match.group()):
+            sections_seen.add(keyword.lower())
+    return len(cv_text), word_count, len(sections_seen)
 
 def structure_cv(cv_text: str) -> dict:
     """
@@ -25,21 +63,165 @@ def structure_cv(cv_text: str) -> dict:
         "structured_sections": structured_sections
     }
 
+# Short-lived CV cache so concurrent analyzers (score + missing keywords
+# for the same CV) share one StoringService round-trip instead of each
+# fetching the document
+_CV_CACHE_TTL = 60.0
+_CV_CACHE_MAXSIZE = 256
+_cv_cache: dict = {}
+
+async def _fetch_cv(cv_id: str) -> dict:
+    """Fetch a CV from StoringService, caching it briefly"""
+    now = time.monotonic()
+    cached = _cv_cache.get(cv_id)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    cv = await aget_cv(cv_id)
+    if len(_cv_cache) >= _CV_CACHE_MAXSIZE:
+        # Drop expired entries first; clear outright if all are fresh
+        expired = [k for k, v in _cv_cache.items() if v[0] <= now]
+        for k in expired:
+            del _cv_cache[k]
+        if len(_cv_cache) >= _CV_CACHE_MAXSIZE:
+            _cv_cache.clear()
+    _cv_cache[cv_id] = (now + _CV_CACHE_TTL, cv)
+    return cv
+
+# LLM-result cache: the same (CV, JD) pair is resubmitted constantly in
+# interactive "tweak & rescore" flows, and the Gemini call dominates
+# request latency, so a hit skips the network + model entirely
+_LLM_CACHE_TTL = 3600.0
+_LLM_CACHE_MAXSIZE = 512
+_llm_cache: dict = {}
+
+# In-flight coalescing: the gateway's /analyze fans out /internal/score
+# and /internal/missing_keywords concurrently, and the cache is only
+# populated on completion — without this, a cold (CV, JD) pair fires
+# the combined Gemini call twice in parallel. Maps key -> asyncio.Task;
+# single event loop, so no lock is needed.
+_llm_inflight: dict = {}
+
+def _analysis_key(kind: str, cv_id: str, jd_text: str) -> str:
+    digest = hashlib.blake2b((cv_id + "|" + jd_text).encode()).hexdigest()[:32]
+    return f"{kind}:{digest}"
+
+async def _cached_llm_call(key: str, func, *args) -> dict:
+    """Run a blocking LLM call in a thread, caching the result by key"""
+    now = time.monotonic()
+    cached = _llm_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    result = await asyncio.to_thread(func, *args)
+    if len(_llm_cache) >= _LLM_CACHE_MAXSIZE:
+        expired = [k for k, v in _llm_cache.items() if v[0] <= now]
+        for k in expired:
+            del _llm_cache[k]
+        if len(_llm_cache) >= _LLM_CACHE_MAXSIZE:
+            _llm_cache.clear()
+    _llm_cache[key] = (now + _LLM_CACHE_TTL, result)
+    return result
+
+async def _full_analysis(jd_text: str, cv_id: str,
+                         no_cache: bool = False) -> dict:
+    """
+    Run (or reuse) the combined score + keywords Gemini analysis
+
+    One LLM call serves both find_missing_keywords and calculate_score:
+    the prompts shared the same structured_sections + JD context, so
+    splitting them doubled tokens and round-trips for the common
+    "run both" flow.
+
+    no_cache skips the cache on both read and write (the gateway
+    forwards its public no_cache flag here so it holds end to end);
+    in-flight coalescing still applies, since a shared in-flight result
+    is freshly computed, not stale.
+    """
+    if not jd_text or not jd_text.strip():
+        raise ValueError("Job description cannot be empty")
+
+    key = _analysis_key("analysis", cv_id, jd_text)
+    if not no_cache:
+        cached = _llm_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+    task = _llm_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _run_full_analysis(key, jd_text, cv_id, no_cache)
+        )
+        _llm_inflight[key] = task
+        task.add_done_callback(lambda _: _llm_inflight.pop(key, None))
+    return await task
+
+async def _run_full_analysis(key: str, jd_text: str, cv_id: str,
+                             no_cache: bool) -> dict:
+    cv = await _fetch_cv(cv_id)
+    structured_sections = cv.get("structured_sections", {})
+
+    # The Gemini SDK call blocks; run it in a worker thread so the event
+    # loop stays free for other requests
+    if no_cache:
+        return await asyncio.to_thread(
+            call_gemini_for_full_analysis, structured_sections, jd_text
+        )
+    return await _cached_llm_call(
+        key, call_gemini_for_full_analysis, structured_sections, jd_text
+    )
+
+async def find_missing_keywords(jd_text: str, cv_id: str,
+                                no_cache: bool = False) -> dict:
+    """
+    Find job-description keywords missing from a stored CV
+
+    Args:
+        jd_text: Job description text
+        cv_id: ID of a CV already stored in StoringService
+        no_cache: Bypass the LLM-result cache (read and write)
+
+    Returns:
+        Dictionary with missing_keywords, matched_keywords and explanation
+    """
+    analysis = await _full_analysis(jd_text, cv_id, no_cache)
+    return {
+        "missing_keywords": analysis["missing_keywords"],
+        "matched_keywords": analysis["matched_keywords"],
+        "explanation": analysis["keywords_explanation"],
+    }
+
+async def calculate_score(jd_text: str, cv_id: str,
+                          no_cache: bool = False) -> dict:
+    """
+    Score a stored CV against a job description
+
+    Args:
+        jd_text: Job description text
+        cv_id: ID of a CV already stored in StoringService
+        no_cache: Bypass the LLM-result cache (read and write)
+
+    Returns:
+        Dictionary with score (0-100) and explanation
+    """
+    analysis = await _full_analysis(jd_text, cv_id, no_cache)
+    return {
+        "score": analysis["score"],
+        "explanation": analysis["score_explanation"],
+    }
+
 def generate_metadata(cv_text: str) -> dict:
     """Generate metadata about the CV"""
-    section_keywords = [
-        'education', 'experience', 'skills', 'projects',
-        'certifications', 'awards', 'leadership', 'summary'
-    ]
-    sections_detected = sum(
-        1 for keyword in section_keywords
-        if keyword.lower() in cv_text.lower()
-    )
-    
+    character_count, word_count, sections_detected = scan_cv(cv_text)
+
     return {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "character_count": len(cv_text),
-        "word_count": len(cv_text.split()),
+        # Timezone-aware replacement for the deprecated utcnow();
+        # milliseconds keep the string compact while staying sortable
+        "timestamp": datetime.now(timezone.utc)
+                             .isoformat(timespec="milliseconds")
+                             .replace("+00:00", "Z"),
+        "character_count": character_count,
+        "word_count": word_count,
         "sections_detected": sections_detected,
         "parser_version": "1.0.0",
         "extraction_method": "gemini-2.5-flash"
@@ -2,8 +2,7 @@
 # GeminiService uses this to fetch CV data
 #
 # Internal API calls:
-# - getCV(cv_id) -> structured_json
-# - getLatestCV() -> structured_json
+# - get_cv(cv_id) -> full CV document
 #
 # Usage:
 # - Called by service.py when needing CV data for LLM operations
@@ -11,6 +10,73 @@
 #
 # Responsibilities:
 # - Build HTTP requests to StoringService endpoints
-# - Handle connection errors and retries
-# - Parse responses
+# - Reuse pooled keep-alive connections (a fresh TCP handshake per call
+#   adds tens of ms and churns ephemeral ports under burst traffic)
+# - Handle connection errors and parse responses
 
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+STORING_SERVICE_URL = os.getenv("STORING_SERVICE_URL", "http://localhost:8001")
+
+_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Shared pooled clients, created lazily. The sync client serves worker
+# threads; the async client serves async endpoints directly.
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+class StoringClientError(Exception):
+    """Custom exception for StoringService errors."""
+
+
+def get_client() -> httpx.Client:
+    """Return the shared sync client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            base_url=STORING_SERVICE_URL, timeout=10.0, limits=_LIMITS
+        )
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared async client, creating it on first use"""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            base_url=STORING_SERVICE_URL, timeout=10.0, limits=_LIMITS
+        )
+    return _async_client
+
+
+def _check_response(resp: httpx.Response) -> Dict[str, Any]:
+    if resp.status_code >= 400:
+        raise StoringClientError(
+            f"StoringService returned {resp.status_code}: {resp.text}"
+        )
+    return resp.json()
+
+
+def get_cv(cv_id: str) -> Dict[str, Any]:
+    """
+    Fetch a CV document by id.
+    Internal endpoint: GET /internal/get_cv/{cv_id}
+    """
+    try:
+        resp = get_client().get(f"/internal/get_cv/{cv_id}")
+    except httpx.RequestError as exc:
+        raise StoringClientError(f"Error connecting to StoringService: {exc}") from exc
+    return _check_response(resp)
+
+
+async def aget_cv(cv_id: str) -> Dict[str, Any]:
+    """Async variant of get_cv for async endpoints"""
+    try:
+        resp = await get_async_client().get(f"/internal/get_cv/{cv_id}")
+    except httpx.RequestError as exc:
+        raise StoringClientError(f"Error connecting to StoringService: {exc}") from exc
+    return _check_response(resp)
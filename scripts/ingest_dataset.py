@@ -0,0 +1,458 @@
+#!/usr/bin/env python
+# Bulk-ingest a JSONL resume dataset into MongoDB + Pinecone
+#
+# Usage:
+#   python scripts/ingest_dataset.py path/to/resumes.jsonl
+#
+# Each line is one resume record. Records may carry structured fields
+# (summary, skills, experience, projects, education) or just a raw
+# "text" field; either way they are mapped into the same
+# structured_sections shape the services use.
+#
+# Flow per record:
+# 1. Build cv_text + cv_id (same SHA256 dedup id as StoringService)
+# 2. Skip records already stored in the dataset_cvs collection
+# 3. Chunk + embed via the VectorService embedder
+# 4. Insert the document into MongoDB
+# 5. Upsert vectors to Pinecone in batches of UPSERT_BATCH
+#
+# Required env: MONGODB_URI, PINECONE_API_KEY, PINECONE_ENVIRONMENT
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import orjson
+import pinecone
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+
+# The embedding + chunking code lives in the VectorService package;
+# this offline script reuses it directly
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "vector_service"))
+
+from app import embedder as vs_embedder  # noqa: E402
+from app import service as vs_service  # noqa: E402
+
+INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "tailorcv-vectors")
+
+# Pinecone caps request sizes; ~100 vectors per upsert keeps each call
+# well under the limit while amortizing HTTP round-trips
+UPSERT_BATCH = int(os.getenv("UPSERT_BATCH", "100"))
+
+# Chunks accumulate across CVs until roughly this many are buffered,
+# then embed in one forward pass; one resume's worth of chunks per
+# encode call leaves the model (and any GPU) mostly idle
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "512"))
+
+# Documents accumulate and are written with one insert_many per batch,
+# amortizing round-trips and journal flushes across hundreds of records
+INSERT_BATCH = int(os.getenv("INSERT_BATCH", "500"))
+
+# Upserts are network-bound, so several 100-vector batches fly in
+# parallel; 8 in-flight requests stays under Pinecone's 429 threshold
+UPSERT_WORKERS = int(os.getenv("UPSERT_WORKERS", "8"))
+
+# Records per worker-pool task: batching amortizes IPC the way map's
+# chunksize would, without map's habit of consuming the whole input
+# iterable up front
+RECORD_CHUNK = int(os.getenv("RECORD_CHUNK", "64"))
+
+# Record batches kept in flight at once; bounds resident memory so the
+# JSONL reader actually streams on gigabyte-scale datasets
+IN_FLIGHT_BATCHES = (os.cpu_count() or 1) * 2
+
+
+def iter_jsonl(path: str):
+    """Yield one parsed record per JSONL line"""
+    # Binary mode with a 1MB buffer: skips per-line UTF-8 decoding (orjson
+    # accepts bytes and decodes internally) and cuts read syscalls; orjson
+    # itself parses 2-5x faster than stdlib json, so on 100k-line datasets
+    # this loop stops being a meaningful share of wall time
+    with open(path, "rb", buffering=1 << 20) as f:
+        for line in f:
+            # Tolerate a trailing newline / blank lines without the
+            # per-line .strip() allocation
+            if line[-1:] == b"\n":
+                line = line[:-1]
+            if line:
+                yield orjson.loads(line)
+
+
+# Hash used for dedup ids. The id only needs to be collision-resistant,
+# not cryptographically strong, so blake2b (~2-3x faster in software than
+# SHA-256) is a good choice for large dataset_cvs runs: CV_HASH=blake2b.
+# The default stays sha256 to keep ids compatible with the user-facing
+# cvs collection until that is migrated.
+HASH_ALGO = os.getenv("CV_HASH", "sha256")
+
+
+def compute_cv_id(cv_text: str) -> str:
+    """Content hash for deduplication (algorithm set via CV_HASH)"""
+    return hashlib.new(HASH_ALGO, cv_text.encode("utf-8")).hexdigest()
+
+
+def record_to_cv_text(record: dict) -> str:
+    """Flatten a dataset record into plain CV text (used for hashing)"""
+    if record.get("text"):
+        return record["text"]
+
+    parts = []
+    if record.get("summary"):
+        parts.append(str(record["summary"]))
+    for entry in record.get("experience") or []:
+        if isinstance(entry, dict):
+            parts.append(" ".join(str(v) for v in entry.values() if v))
+        else:
+            parts.append(str(entry))
+    for entry in record.get("projects") or []:
+        if isinstance(entry, dict):
+            parts.append(" ".join(str(v) for v in entry.values() if v))
+        else:
+            parts.append(str(entry))
+    skills = record.get("skills")
+    if isinstance(skills, list):
+        parts.append(", ".join(str(s) for s in skills))
+    elif skills:
+        parts.append(str(skills))
+    for entry in record.get("education") or []:
+        if isinstance(entry, dict):
+            parts.append(" ".join(str(v) for v in entry.values() if v))
+        else:
+            parts.append(str(entry))
+    return "\n".join(parts)
+
+
+def build_structured_sections_from_record(record: dict) -> dict:
+    """Map a dataset record into the structured_sections shape"""
+    sections = {}
+
+    if record.get("summary"):
+        sections["summary"] = {"text": str(record["summary"]), "key_highlights": []}
+
+    skills = record.get("skills")
+    if isinstance(skills, list) and skills:
+        sections["skills"] = {"other": [str(s) for s in skills]}
+    elif isinstance(skills, dict):
+        sections["skills"] = skills
+
+    for key in ("experience", "projects", "education"):
+        value = record.get(key)
+        if isinstance(value, list) and value:
+            sections[key] = [v for v in value if isinstance(v, dict)]
+
+    return sections
+
+
+def get_mongo_collection():
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        raise ValueError("MONGODB_URI not found in environment variables")
+    client = MongoClient(mongodb_uri)
+    return client["tailorcv_db"]["dataset_cvs"]
+
+
+def get_pinecone_index():
+    api_key = os.getenv("PINECONE_API_KEY")
+    if not api_key:
+        raise ValueError("PINECONE_API_KEY not found in environment variables")
+    pinecone.init(api_key=api_key, environment=os.getenv("PINECONE_ENVIRONMENT"))
+    # gRPC multiplexes upserts over one HTTP/2 connection and skips REST
+    # JSON overhead; only available with pinecone-client[grpc] installed
+    try:
+        return pinecone.GRPCIndex(INDEX_NAME)
+    except AttributeError:
+        return pinecone.Index(INDEX_NAME)
+
+
+def load_existing_ids(collection, dataset_path: str) -> tuple:
+    """
+    Pre-pass: compute every record's cv_id and look them all up with
+    chunked $in queries (one round-trip per 1000 ids) instead of one
+    find_one per record during the main loop
+
+    Returns:
+        (embedded_ids, stored_ids): ids whose vectors are already in
+        Pinecone (pinecone_ingested flag set) and ids merely present in
+        Mongo. Stored-but-unflagged CVs (e.g. from a run that crashed
+        before upserting) get re-embedded but not re-inserted.
+    """
+    candidate_ids = []
+    for record in iter_jsonl(dataset_path):
+        cv_text = record_to_cv_text(record)
+        if cv_text.strip():
+            candidate_ids.append(compute_cv_id(cv_text))
+
+    embedded = set()
+    stored = set()
+    for start in range(0, len(candidate_ids), 1000):
+        batch = candidate_ids[start:start + 1000]
+        cursor = collection.find(
+            {"cv_id": {"$in": batch}},
+            {"cv_id": 1, "pinecone_ingested": 1, "_id": 0},
+        )
+        for doc in cursor:
+            stored.add(doc["cv_id"])
+            if doc.get("pinecone_ingested"):
+                embedded.add(doc["cv_id"])
+    return embedded, stored
+
+
+def upsert_with_retry(index, vectors, max_retries: int = 3):
+    """Upsert one batch, backing off on transient Pinecone errors (429s)"""
+    delay = 1.0
+    for attempt in range(max_retries):
+        try:
+            return index.upsert(vectors=vectors)
+        except Exception as e:
+            if attempt == max_retries - 1:
+                raise
+            print(f"Upsert failed ({e}); retrying in {delay:.0f}s")
+            time.sleep(delay)
+            delay *= 2
+
+
+# Bounded pool of in-flight upserts; the semaphore caps the backlog so
+# the producer can't race arbitrarily far ahead of the network
+_upsert_pool = ThreadPoolExecutor(max_workers=UPSERT_WORKERS)
+_upsert_slots = threading.Semaphore(UPSERT_WORKERS * 2)
+_upsert_futures = []
+
+
+def submit_upsert(index, vectors):
+    """Queue one upsert batch on the worker pool"""
+    _upsert_slots.acquire()
+    future = _upsert_pool.submit(upsert_with_retry, index, vectors)
+    future.add_done_callback(lambda _: _upsert_slots.release())
+    _upsert_futures.append(future)
+
+
+def drain_upserts():
+    """Wait for all queued upserts, re-raising the first failure"""
+    for future in _upsert_futures:
+        future.result()
+    _upsert_futures.clear()
+
+
+def build_vectors(cv_id: str, chunks: list) -> list:
+    """Build (id, values, metadata) tuples for Pinecone"""
+    vectors = []
+    for j, chunk in enumerate(chunks):
+        vectors.append((
+            f"{cv_id}_{chunk['section']}_{j}",
+            chunk["embedding"],
+            {"cv_id": cv_id, "section": chunk["section"], "raw_text": chunk["text"]},
+        ))
+    return vectors
+
+
+def process_record(item):
+    """
+    Pure-CPU transform of one dataset record (runs in a worker process)
+
+    Flattening, hashing, and chunking are plain Python CPU work; running
+    them in a process pool overlaps them with the embedding forward pass
+    and the Mongo/Pinecone I/O driven by the main process.
+    """
+    i, record = item
+    cv_text = record_to_cv_text(record)
+    if not cv_text.strip():
+        return None
+    cv_id = compute_cv_id(cv_text)
+    structured_sections = build_structured_sections_from_record(record)
+    all_chunks = (
+        vs_service.chunk_structured_sections(structured_sections, cv_id)
+        + vs_service.chunk_experience_bullets(
+            structured_sections.get("experience", []), cv_id
+        )
+        + vs_service.chunk_projects_bullets(
+            structured_sections.get("projects", []), cv_id
+        )
+    )
+    return i, cv_id, cv_text, structured_sections, all_chunks
+
+
+def process_records(batch):
+    """Transform a batch of records in one worker-pool task"""
+    return [process_record(item) for item in batch]
+
+
+def flush_inserts(collection, documents):
+    """Write buffered documents in one unordered insert_many"""
+    if not documents:
+        return
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        # Unordered writes keep going past duplicates; only surface
+        # non-duplicate errors (11000 = duplicate key)
+        real_errors = [
+            err for err in e.details.get("writeErrors", [])
+            if err.get("code") != 11000
+        ]
+        if real_errors:
+            raise
+    documents.clear()
+
+
+def flush_cv_buffer(cv_buffer, collection, index, pending, pending_inserts,
+                    pending_flags):
+    """
+    Embed every buffered chunk in one forward pass, then feed the
+    results into the batched Pinecone upsert and Mongo insert paths
+
+    CVs already stored in Mongo (document is None) skip the insert; new
+    documents land with pinecone_ingested unset. Either way the flag is
+    only flipped, via pending_flags, after the CV's vectors are
+    confirmed in Pinecone.
+    """
+    flat_chunks = [chunk for _, chunks, _ in cv_buffer for chunk in chunks]
+    vs_embedder.embed_chunks(flat_chunks)
+
+    for cv_id, chunks, document in cv_buffer:
+        pending.extend(build_vectors(cv_id, chunks))
+        while len(pending) >= UPSERT_BATCH:
+            submit_upsert(index, pending[:UPSERT_BATCH])
+            del pending[:UPSERT_BATCH]
+        if document is not None:
+            pending_inserts.append(document)
+        pending_flags.append(cv_id)
+        if len(pending_inserts) >= INSERT_BATCH:
+            flush_inserts(collection, pending_inserts)
+        if len(pending_flags) >= INSERT_BATCH:
+            # The flag must never outrun the vectors: push the partial
+            # vector batch, wait for every in-flight upsert, and land
+            # the documents before flipping their flags
+            if pending:
+                # Copy: the worker thread reads the list after we clear it
+                submit_upsert(index, pending[:])
+                pending.clear()
+            drain_upserts()
+            flush_inserts(collection, pending_inserts)
+            flush_flags(collection, pending_flags)
+    cv_buffer.clear()
+
+
+def flush_flags(collection, cv_ids):
+    """Mark CVs whose vectors are safely upserted in one update_many"""
+    if not cv_ids:
+        return
+    collection.update_many(
+        {"cv_id": {"$in": cv_ids}}, {"$set": {"pinecone_ingested": True}}
+    )
+    cv_ids.clear()
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/ingest_dataset.py path/to/resumes.jsonl")
+        sys.exit(1)
+    dataset_path = sys.argv[1]
+
+    collection = get_mongo_collection()
+    index = get_pinecone_index()
+
+    existing_ids, stored_ids = load_existing_ids(collection, dataset_path)
+    print(f"Found {len(existing_ids)} already-ingested CVs "
+          f"({len(stored_ids) - len(existing_ids)} stored but not embedded)")
+
+    # Vectors accumulate across CVs and flush in UPSERT_BATCH-sized
+    # requests; one unbounded upsert per CV wastes round-trips on small
+    # CVs and risks oversized requests on large ones
+    pending = []
+    # Documents awaiting the next batched insert_many
+    pending_inserts = []
+    # cv_ids awaiting their pinecone_ingested flag, flipped only after
+    # their vectors are confirmed in Pinecone
+    pending_flags = []
+    # CVs whose chunks are buffered awaiting the next batched embed
+    cv_buffer = []
+    buffered_chunks = 0
+    ingested = 0
+    skipped = 0
+
+    # Record transforms run in worker processes while this process
+    # drives the embed/insert/upsert pipelines. Executor.map would pull
+    # the entire input iterable into queued work items immediately,
+    # materializing the dataset in memory; instead keep a bounded window
+    # of record batches in flight, refilling in order as each completes
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        records = enumerate(iter_jsonl(dataset_path))
+        in_flight = deque()
+
+        def submit_batch():
+            batch = list(islice(records, RECORD_CHUNK))
+            if batch:
+                in_flight.append(pool.submit(process_records, batch))
+
+        for _ in range(IN_FLIGHT_BATCHES):
+            submit_batch()
+
+        def iter_results():
+            while in_flight:
+                batch_results = in_flight.popleft().result()
+                submit_batch()
+                yield from batch_results
+
+        for result in iter_results():
+            if result is None:
+                continue
+            i, cv_id, cv_text, structured_sections, all_chunks = result
+
+            if cv_id in existing_ids:
+                skipped += 1
+                continue
+            # Also covers duplicate records within the dataset itself
+            existing_ids.add(cv_id)
+
+            if not all_chunks:
+                skipped += 1
+                continue
+
+            # None document = re-embed of a stored-but-unflagged CV
+            document = None
+            if cv_id not in stored_ids:
+                document = {
+                    "cv_id": cv_id,
+                    "cv_text": cv_text,
+                    "structured_sections": structured_sections,
+                    "source_index": i,
+                    # Unset until the CV's vectors are confirmed in
+                    # Pinecone; a crash mid-run then leaves the doc
+                    # stored-but-unflagged and the next run re-embeds it
+                    # instead of silently skipping it
+                    "pinecone_ingested": False,
+                }
+            cv_buffer.append((cv_id, all_chunks, document))
+            buffered_chunks += len(all_chunks)
+            if buffered_chunks >= EMBED_BATCH:
+                flush_cv_buffer(cv_buffer, collection, index, pending,
+                                pending_inserts, pending_flags)
+                buffered_chunks = 0
+
+            ingested += 1
+            if ingested % 100 == 0:
+                print(f"Ingested {ingested} CVs ({skipped} skipped)")
+
+    # Final flush of buffered CVs, documents, and the partial vector batch
+    if cv_buffer:
+        flush_cv_buffer(cv_buffer, collection, index, pending,
+                        pending_inserts, pending_flags)
+    if pending:
+        submit_upsert(index, pending)
+    # All vectors must be in Pinecone before documents are flagged
+    drain_upserts()
+    flush_inserts(collection, pending_inserts)
+    flush_flags(collection, pending_flags)
+
+    print(f"Done: {ingested} ingested, {skipped} skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from app.service import store_cv, get_cv_by_id
+from app.events import publish_cv_event
+from app.service import store_cv, store_cvs, get_all_cvs, get_cv_by_id
 
 router = APIRouter()
 
@@ -14,7 +16,7 @@ class StoreCVResponse(BaseModel):
     message: str
 
 @router.post("/internal/store_cv", response_model=StoreCVResponse)
-async def store_cv_endpoint(request: StoreCVRequest):
+async def store_cv_endpoint(request: StoreCVRequest, background: BackgroundTasks):
     """
     Store structured CV in MongoDB with deduplication
     
@@ -26,11 +28,62 @@ async def store_cv_endpoint(request: StoreCVRequest):
         cv_id (SHA256 hash) and status
     """
     try:
-        result = store_cv(request.structured_json, request.cv_text)
+        # store_cv blocks on Mongo; run it in the threadpool so the event
+        # loop stays free. The cv.created publish runs after the response
+        # is sent, so clients don't wait on RabbitMQ.
+        result = await run_in_threadpool(
+            store_cv, request.structured_json, request.cv_text
+        )
+        if result["status"] == "stored":
+            background.add_task(publish_cv_event, result["cv_id"])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to store CV: {str(e)}")
 
+class StoreCVBatchRequest(BaseModel):
+    items: list[StoreCVRequest]
+
+@router.post("/internal/store_cvs", response_model=list[StoreCVResponse])
+async def store_cvs_endpoint(request: StoreCVBatchRequest, background: BackgroundTasks):
+    """
+    Store a batch of CVs in one dedup query + one bulk insert
+
+    Args:
+        items: list of {structured_json, cv_text} pairs
+
+    Returns:
+        One {cv_id, status, message} result per item, in input order
+    """
+    try:
+        results = await run_in_threadpool(
+            store_cvs,
+            [(item.structured_json, item.cv_text) for item in request.items],
+        )
+        for result in results:
+            if result["status"] == "stored":
+                background.add_task(publish_cv_event, result["cv_id"])
+        return results
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store CVs: {str(e)}")
+
+@router.get("/internal/list_cvs")
+async def list_cvs_endpoint(limit: int = 10):
+    """
+    List the most recently stored CVs, newest first
+
+    Args:
+        limit: Maximum number of CVs to return
+
+    Returns:
+        List of CV documents
+    """
+    try:
+        # get_all_cvs blocks on Mongo; keep the event loop free, same as
+        # the store endpoints above
+        return await run_in_threadpool(get_all_cvs, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list CVs: {str(e)}")
+
 @router.get("/internal/get_cv/{cv_id}")
 async def get_cv_endpoint(cv_id: str):
     """
@@ -1,6 +1,6 @@
 import os
-from pymongo import MongoClient, DESCENDING
-from pymongo.errors import DuplicateKeyError
+from pymongo import MongoClient, DESCENDING, WriteConcern
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,20 +11,32 @@ if not MONGODB_URI:
 
 client = MongoClient(MONGODB_URI)
 db = client["tailorcv_db"]
-collection = db["cvs"]
+# CVs are idempotent and re-derivable from raw text, so acknowledged-by-
+# primary without journal fsync (w:1, j:false) is enough; on replica sets
+# this skips the majority-commit wait on every insert
+collection = db.get_collection("cvs", write_concern=WriteConcern(w=1, j=False))
 
 def create_indexes():
     """Create indexes on cv_id and created_at"""
     try:
-        collection.create_index("cv_id", unique=True)
+        # cv_id is stored as _id, so the built-in _id_ index enforces
+        # uniqueness; a separate unique index on cv_id would just double
+        # the write amplification
         collection.create_index([("created_at", DESCENDING)])
+        # Covering index for the recent-CVs listing: sort key plus the
+        # projected fields, so the query can be answered from index pages
+        # without fetching full documents
+        collection.create_index(
+            [("created_at", DESCENDING), ("cv_id", 1), ("metadata.filename", 1)],
+            name="recent_cvs_cov",
+        )
         print("Database indexes created successfully")
     except Exception as e:
         print(f"Index creation (likely already exist): {str(e)}")
 
 def find_cv_by_id(cv_id: str) -> dict:
-    """Find CV by cv_id hash"""
-    return collection.find_one({"cv_id": cv_id}, {"_id": 0})
+    """Find CV by cv_id hash (stored as _id)"""
+    return collection.find_one({"_id": cv_id}, {"_id": 0})
 
 def insert_cv_document(document: dict) -> str:
     """
@@ -42,6 +54,44 @@ def insert_cv_document(document: dict) -> str:
     collection.insert_one(document)
     return document["cv_id"]
 
+def find_all_cvs(limit: int = 10) -> list:
+    """
+    List the most recently created CVs, newest first
+
+    Projects only the listing fields and hints the recent_cvs_cov index,
+    so the query is fully covered: Mongo answers from index pages alone
+    instead of fetching documents whose cv_text can run to hundreds of KB.
+    """
+    cursor = collection.find(
+        {}, {"cv_id": 1, "metadata.filename": 1, "created_at": 1, "_id": 0}
+    ).sort("created_at", DESCENDING).limit(limit).hint("recent_cvs_cov")
+    return list(cursor)
+
+def find_cv_ids(cv_ids: list) -> set:
+    """Return which of the given cv_ids already exist (one $in query)"""
+    cursor = collection.find({"_id": {"$in": cv_ids}}, {"_id": 1})
+    return {doc["_id"] for doc in cursor}
+
+def insert_cv_documents(documents: list) -> None:
+    """
+    Insert a batch of CV documents in one unordered insert_many
+
+    Unordered writes keep going past duplicate-key collisions (a
+    concurrent store of the same CV); only non-duplicate errors are
+    re-raised.
+    """
+    if not documents:
+        return
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        real_errors = [
+            err for err in e.details.get("writeErrors", [])
+            if err.get("code") != 11000
+        ]
+        if real_errors:
+            raise
+
 def find_latest_cv() -> dict:
     """Find most recently created CV"""
     return collection.find_one(
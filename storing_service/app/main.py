@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from app.api import router
 from app.db_mongo import create_indexes
+from app.events import close_rabbitmq_connection
+from app.middleware import GzipRequestMiddleware
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +18,13 @@ def startup_event():
     """Initialize database indexes on startup"""
     create_indexes()
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Close the shared RabbitMQ publisher connection"""
+    close_rabbitmq_connection()
+
+app.add_middleware(GzipRequestMiddleware)
+
 app.include_router(router)
 
 @app.get("/health")
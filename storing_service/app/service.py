@@ -1,6 +1,45 @@
 import hashlib
-from datetime import datetime
-from app.db_mongo import find_cv_by_id, insert_cv_document
+import os
+from datetime import datetime, timezone
+from app.db_mongo import (
+    find_all_cvs,
+    find_cv_by_id,
+    find_cv_ids,
+    insert_cv_document,
+    insert_cv_documents,
+)
+from pymongo.errors import DuplicateKeyError
+
+def _detect_hash_algo() -> str:
+    """
+    Pick the dedup hash backend once at import
+
+    cv_id is the system-wide CV identifier, so the backend must be the
+    same on every replica: the default stays sha256 everywhere, and a
+    deployment opts in per fleet via CV_HASH_ALGO — either a concrete
+    hashlib name, or "auto" to prefer sha256 on CPUs advertising SHA-NI
+    (OpenSSL dispatches to the 2-5x hardware path) and blake2b, the
+    faster software implementation, otherwise. "auto" is only safe on
+    homogeneous fleets.
+    """
+    algo = os.getenv("CV_HASH_ALGO", "sha256")
+    if algo != "auto":
+        return algo
+    try:
+        with open("/proc/cpuinfo") as f:
+            if "sha_ni" in f.read():
+                return "sha256"
+    except OSError:
+        # Non-Linux: no flags file; assume OpenSSL picks the best path
+        return "sha256"
+    return "blake2b"
+
+
+# Content-fingerprint hash for dedup ids. There is no adversary here, so
+# a faster backend is fair game where the fleet is uniform; mirrors the
+# CV_HASH knob in scripts/ingest_dataset.py.
+CV_HASH_ALGO = _detect_hash_algo()
+print(f"CV dedup hash backend: {CV_HASH_ALGO}")
 
 def store_cv(structured_json: dict, cv_text: str) -> dict:
     """
@@ -14,37 +53,114 @@ def store_cv(structured_json: dict, cv_text: str) -> dict:
     Returns:
         Dictionary with cv_id and status
     """
-    # Calculate SHA256 hash of raw text
-    cv_id = hashlib.sha256(cv_text.encode('utf-8')).hexdigest()
-    
-    # Check for duplicates
-    existing = find_cv_by_id(cv_id)
-    if existing:
-        return {
-            "cv_id": cv_id,
-            "status": "already_exists",
-            "message": "CV with this content already exists"
-        }
-    
-    # Create document
+    # Calculate content hash of raw text (algorithm set via CV_HASH_ALGO).
+    # Feeding the encoder output through update() lets the bytes buffer be
+    # released as soon as hashing finishes instead of living across the
+    # constructor call; hashlib's OpenSSL backend is SHA-NI/AVX
+    # accelerated where the CPU supports it.
+    hasher = hashlib.new(CV_HASH_ALGO)
+    hasher.update(cv_text.encode('utf-8'))
+    cv_id = hasher.hexdigest()
+
+    # Create document. The content hash is the _id, so dedup rides on
+    # the mandatory _id_ index: a duplicate surfaces as DuplicateKeyError
+    # in the same round-trip as the insert, replacing the old
+    # find-then-insert pair.
+    now = datetime.now(timezone.utc)
     document = {
+        "_id": cv_id,
         "cv_id": cv_id,
         "cv_text": cv_text,
+        # Lowercased once at ingest so keyword scans over many CVs skip
+        # a full-text .lower() allocation per analysis call; storage cost
+        # is ~2x the text, which is small next to structured_sections
+        "cv_text_lower": cv_text.lower(),
         "metadata": structured_json.get("metadata", {}),
         "structured_sections": structured_json.get("structured_sections", {}),
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        # One clock read: created_at and updated_at should be identical
+        # on insert, and the two utcnow() calls could differ by
+        # microseconds (utcnow is also deprecated in 3.12)
+        "created_at": now,
+        "updated_at": now
     }
     
-    # Insert into MongoDB
-    insert_cv_document(document)
-    
+    # Insert into MongoDB. The cv.created publish happens in the API
+    # layer as a background task so the HTTP response isn't held up
+    try:
+        insert_cv_document(document)
+    except DuplicateKeyError:
+        return {
+            "cv_id": cv_id,
+            "status": "already_exists",
+            "message": "CV with this content already exists"
+        }
+
     return {
         "cv_id": cv_id,
         "status": "stored",
         "message": "CV stored successfully"
     }
 
+def store_cvs(pairs: list) -> list:
+    """
+    Store a batch of CVs with one dedup query and one bulk insert
+
+    Per-document store_cv calls pay a find + insert round-trip each;
+    batched ingest (e.g. bursts off the queue) instead hashes everything,
+    checks existing ids with a single $in query, and writes the remainder
+    in one unordered insert_many.
+
+    Args:
+        pairs: list of (structured_json, cv_text) tuples
+
+    Returns:
+        One result dict per input pair, in input order
+    """
+    now = datetime.now(timezone.utc)
+
+    entries = []
+    for structured_json, cv_text in pairs:
+        hasher = hashlib.new(CV_HASH_ALGO)
+        hasher.update(cv_text.encode('utf-8'))
+        entries.append((hasher.hexdigest(), structured_json, cv_text))
+
+    existing = find_cv_ids([cv_id for cv_id, _, _ in entries])
+
+    documents = []
+    results = []
+    seen_in_batch = set()
+    for cv_id, structured_json, cv_text in entries:
+        if cv_id in existing or cv_id in seen_in_batch:
+            results.append({
+                "cv_id": cv_id,
+                "status": "already_exists",
+                "message": "CV with this content already exists"
+            })
+            continue
+        seen_in_batch.add(cv_id)
+        documents.append({
+            "_id": cv_id,
+            "cv_id": cv_id,
+            "cv_text": cv_text,
+            "cv_text_lower": cv_text.lower(),
+            "metadata": structured_json.get("metadata", {}),
+            "structured_sections": structured_json.get("structured_sections", {}),
+            "created_at": now,
+            "updated_at": now
+        })
+        results.append({
+            "cv_id": cv_id,
+            "status": "stored",
+            "message": "CV stored successfully"
+        })
+
+    insert_cv_documents(documents)
+    return results
+
+def get_all_cvs(limit: int = 10) -> list:
+    """List the most recently stored CVs"""
+    return find_all_cvs(limit)
+
 def get_cv_by_id(cv_id: str) -> dict:
     """Retrieve CV by cv_id"""
     cv = find_cv_by_id(cv_id)
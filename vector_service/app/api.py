@@ -3,24 +3,69 @@
 #
 # Internal Endpoints:
 # 1. POST /internal/similar_chunks - Find similar CV chunks to JD
-#    Input: {jd_text}
-#    Output: {chunks: [{text, section, cv_id, score}, ...]}
-#    Flow:
-#      - Embed jd_text using BGE-large model
-#      - Query Pinecone for top similar vectors
-#      - Return chunks with metadata
-#
 # 2. POST /internal/search_top_k_cvs - Find top-k similar CVs
-#    Input: {jd_text, top_k: 3}
-#    Output: {cvs: [{cv_id, score}, ...]}
-#    Flow:
-#      - Embed jd_text using BGE-large model
-#      - Query Pinecone for similar vectors
-#      - Aggregate scores by cv_id
-#      - Return top k CVs sorted by score
 #
 # Responsibilities:
 # - Route requests to service.py business logic
 # - Validate input
 # - Handle errors and return appropriate HTTP status codes
 
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from app.service import find_similar_chunks, search_top_k_cvs
+
+router = APIRouter()
+
+class SimilarChunksRequest(BaseModel):
+    jd_text: str
+    top_k: int = 10
+
+class SearchTopKRequest(BaseModel):
+    jd_text: str
+    top_k: int = 3
+
+@router.post("/internal/similar_chunks")
+async def similar_chunks_endpoint(request: SimilarChunksRequest):
+    """
+    Find CV chunks most similar to a job description
+
+    Args:
+        jd_text: Job description text
+        top_k: Number of chunks to return
+
+    Returns:
+        chunks with text, section, cv_id, and score
+    """
+    try:
+        # Embedding + Pinecone query block; run in a worker thread so the
+        # event loop stays free for other requests
+        return await asyncio.to_thread(
+            find_similar_chunks, request.jd_text, request.top_k
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to find similar chunks: {str(e)}")
+
+@router.post("/internal/search_top_k_cvs")
+async def search_top_k_cvs_endpoint(request: SearchTopKRequest):
+    """
+    Find the CVs most similar to a job description
+
+    Args:
+        jd_text: Job description text
+        top_k: Number of CVs to return
+
+    Returns:
+        cvs ranked by best chunk score
+    """
+    try:
+        return await asyncio.to_thread(
+            search_top_k_cvs, request.jd_text, request.top_k
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search CVs: {str(e)}")
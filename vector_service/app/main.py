@@ -4,9 +4,43 @@
 # Responsibilities:
 # - Initialize FastAPI application
 # - Register internal API routes from api.py
-# - Initialize BGE-large embedding model
-# - Initialize Pinecone VectorDB client
 # - Start RabbitMQ consumer in background
-# - Initialize HTTP client to StoringService
 # - Health check endpoint
 
+import threading
+
+from fastapi import FastAPI
+from app.api import router
+from app.embedder import warmup
+from app.middleware import GzipRequestMiddleware
+from app.mq_consumer import start_consumer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+app = FastAPI(
+    title="VectorService",
+    description="Embeddings and semantic search with Pinecone",
+    version="1.0.0"
+)
+
+@app.on_event("startup")
+def startup_event():
+    """Warm the embedding model, then start the cv.created consumer"""
+    # Loading BGE takes seconds; doing it lazily would block the first
+    # consumed message (and the first search request) on a cold model.
+    # warmup() also primes per-bucket torch.compile/autocast caches.
+    warmup()
+    threading.Thread(target=start_consumer, daemon=True).start()
+
+app.add_middleware(GzipRequestMiddleware)
+
+app.include_router(router)
+
+@app.get("/health")
+def health_check():
+    return {
+        "status": "healthy",
+        "service": "VectorService",
+        "version": "1.0.0"
+    }
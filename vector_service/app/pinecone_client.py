@@ -11,21 +11,65 @@
 #   "raw_text": "chunk text content"
 # }
 #
-# Operations:
-# - upsert_vectors(vectors, metadata) -> success/failure
-#   * Insert/update vectors with metadata
-#   * Used after embedding chunks
-#
-# - query_similar(query_vector, top_k) -> matches
-#   * Find top k similar vectors
-#   * Return matches with metadata and scores
-#
-# - delete_by_cv_id(cv_id) -> success/failure
-#   * Remove all vectors for a specific CV
-#   * Used if CV needs to be deleted
-#
 # Responsibilities:
 # - Pinecone client initialization and authentication
 # - Vector CRUD operations
 # - Query execution with similarity search
 
+import os
+
+import pinecone
+
+INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "tailorcv-vectors")
+
+# Pinecone caps request sizes; ~100 vectors per upsert keeps each call
+# well under the limit while amortizing HTTP round-trips
+UPSERT_BATCH = 100
+
+_index = None
+
+
+def get_index():
+    """Initialize Pinecone once and reuse the index handle"""
+    global _index
+    if _index is None:
+        api_key = os.getenv("PINECONE_API_KEY")
+        if not api_key:
+            raise ValueError("PINECONE_API_KEY not found in environment variables")
+        pinecone.init(
+            api_key=api_key, environment=os.getenv("PINECONE_ENVIRONMENT")
+        )
+        _index = pinecone.Index(INDEX_NAME)
+    return _index
+
+
+def upsert_vectors(vectors: list) -> None:
+    """
+    Upsert (id, values, metadata) tuples in batches of UPSERT_BATCH
+    """
+    index = get_index()
+    for start in range(0, len(vectors), UPSERT_BATCH):
+        index.upsert(vectors=vectors[start:start + UPSERT_BATCH])
+
+
+def query_similar(query_vector: list, top_k: int = 10, flt: dict = None) -> list:
+    """
+    Find the top_k most similar vectors, optionally metadata-filtered
+
+    Returns:
+        List of matches with id, score, and metadata
+    """
+    index = get_index()
+    result = index.query(
+        vector=query_vector,
+        top_k=top_k,
+        filter=flt,
+        include_metadata=True,
+    )
+    return result.get("matches", [])
+
+
+def delete_by_cv_id(cv_id: str) -> None:
+    """Remove all vectors belonging to one CV"""
+    index = get_index()
+    index.delete(filter={"cv_id": cv_id})
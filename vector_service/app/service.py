@@ -1,31 +1,235 @@
 # VectorService - Business Logic
 # Handles chunking, embedding, and semantic search
 #
-# Functions:
-# - find_similar_chunks(jd_text) -> chunks
-#   * Embed JD using embedder.py
-#   * Query Pinecone using pinecone_client.py
-#   * Return similar chunks with metadata
-#
-# - search_top_k_cvs(jd_text, top_k) -> cv_ids with scores
-#   * Embed JD using embedder.py
-#   * Query Pinecone for similar vectors
-#   * Aggregate scores by cv_id (sum or average)
-#   * Sort and return top k
-#
-# - process_cv_for_embedding(cv_id) -> success/failure
-#   * Called by mq_consumer.py when cv.created event received
-#   * Fetch CV from StoringService
-#   * Chunk CV by sections
-#   * Embed each chunk
-#   * Upsert to Pinecone with metadata
-#
 # Chunking Strategy:
-# - Each section (experience, projects, skills, education) = 1 chunk
-# - Metadata per chunk: {cv_id, section, raw_text}
+# - summary / education / skills categories -> one chunk each
+# - experience / projects -> one chunk per bullet point
+# - Metadata per chunk: {cv_id, section, text}
 #
 # Responsibilities:
 # - Chunking logic
 # - Orchestrate embedding and vector operations
 # - Coordinate between StoringService and Pinecone
 
+from app.embedder import embed_chunks, embed_text
+from app.pinecone_client import query_similar, upsert_vectors
+from app.storing_client import get_cv
+
+
+def _chunk_summary(section_name, section_data, cv_id, chunks):
+    if isinstance(section_data, dict) and section_data.get("text"):
+        chunks.append({
+            "cv_id": cv_id,
+            "section": "summary",
+            "text": section_data["text"],
+        })
+
+
+def _chunk_skills(section_name, section_data, cv_id, chunks):
+    if isinstance(section_data, dict):
+        for category, items in section_data.items():
+            if isinstance(items, list) and items:
+                chunks.append({
+                    "cv_id": cv_id,
+                    "section": "skills",
+                    "text": f"{category}: {', '.join(str(i) for i in items)}",
+                })
+
+
+def _chunk_education(section_name, section_data, cv_id, chunks):
+    if isinstance(section_data, list):
+        for entry in section_data:
+            if isinstance(entry, dict):
+                parts = [entry.get("institution"), entry.get("degree"),
+                         entry.get("field")]
+                text = " - ".join(p for p in parts if p)
+                if text:
+                    chunks.append({
+                        "cv_id": cv_id,
+                        "section": "education",
+                        "text": text,
+                    })
+
+
+def _chunk_skip(section_name, section_data, cv_id, chunks):
+    # contact is not semantic content; experience/projects get per-bullet
+    # chunks from their dedicated helpers
+    pass
+
+
+def _chunk_generic(section_name, section_data, cv_id, chunks):
+    # certifications, awards, leadership, publications, ...
+    if isinstance(section_data, list):
+        for entry in section_data:
+            if isinstance(entry, dict):
+                text = entry.get("name") or entry.get("title") or entry.get("role")
+                if text:
+                    chunks.append({
+                        "cv_id": cv_id,
+                        "section": section_name,
+                        "text": text,
+                    })
+
+
+# One hash lookup per section instead of walking an if/elif chain of
+# string compares for every CV
+_SECTION_HANDLERS = {
+    "summary": _chunk_summary,
+    "skills": _chunk_skills,
+    "education": _chunk_education,
+    "contact": _chunk_skip,
+    "experience": _chunk_skip,
+    "projects": _chunk_skip,
+    "additional_sections": _chunk_skip,
+}
+
+
+def chunk_structured_sections(structured_sections: dict, cv_id: str) -> list:
+    """
+    Chunk the non-bullet sections of a structured CV
+
+    Experience and projects are handled separately (per bullet) by
+    chunk_experience_bullets / chunk_projects_bullets.
+    """
+    chunks = []
+    for section_name, section_data in structured_sections.items():
+        handler = _SECTION_HANDLERS.get(section_name, _chunk_generic)
+        handler(section_name, section_data, cv_id, chunks)
+    return chunks
+
+
+def chunk_experience_bullets(experience: list, cv_id: str) -> list:
+    """One chunk per experience bullet, prefixed with the company name"""
+    chunks = []
+    # Local binding skips the attribute lookup per bullet; CVs routinely
+    # carry 50+ bullets
+    append = chunks.append
+    for entry in experience or []:
+        if not isinstance(entry, dict):
+            continue
+        company = entry.get("company") or "Unknown"
+        for bullet in entry.get("bullets") or []:
+            stripped = bullet.strip() if bullet else ""
+            if not stripped:
+                continue
+            append({
+                "cv_id": cv_id,
+                "section": "experience",
+                "text": f"{company} - {stripped}",
+            })
+    return chunks
+
+
+def chunk_projects_bullets(projects: list, cv_id: str) -> list:
+    """One chunk per project description, prefixed with the project name"""
+    chunks = []
+    append = chunks.append
+    for entry in projects or []:
+        if not isinstance(entry, dict):
+            continue
+        name = entry.get("name") or "Project"
+        description = (entry.get("description") or "").strip()
+        if description:
+            append({
+                "cv_id": cv_id,
+                "section": "projects",
+                "text": f"{name} - {description}",
+            })
+        for bullet in entry.get("bullets") or []:
+            stripped = bullet.strip() if bullet else ""
+            if not stripped:
+                continue
+            append({
+                "cv_id": cv_id,
+                "section": "projects",
+                "text": f"{name} - {stripped}",
+            })
+    return chunks
+
+
+def process_cv_for_embedding(cv_id: str) -> int:
+    """
+    Fetch, chunk, embed, and upsert one CV (cv.created handler)
+
+    All chunk sources are concatenated before embedding so the encoder
+    sees one batch instead of three small ones — that keeps the
+    length-bucket batching effective across sections and the model busy.
+
+    Returns:
+        Number of chunks embedded and upserted
+    """
+    cv = get_cv(cv_id)
+    structured_sections = cv.get("structured_sections", {})
+
+    all_chunks = (
+        chunk_structured_sections(structured_sections, cv_id)
+        + chunk_experience_bullets(structured_sections.get("experience", []), cv_id)
+        + chunk_projects_bullets(structured_sections.get("projects", []), cv_id)
+    )
+    if not all_chunks:
+        return 0
+
+    embed_chunks(all_chunks)
+
+    vectors = []
+    for j, chunk in enumerate(all_chunks):
+        vectors.append((
+            f"{cv_id}_{chunk['section']}_{j}",
+            chunk["embedding"],
+            {"cv_id": cv_id, "section": chunk["section"], "raw_text": chunk["text"]},
+        ))
+    upsert_vectors(vectors)
+    return len(all_chunks)
+
+
+def find_similar_chunks(jd_text: str, top_k: int = 10) -> dict:
+    """
+    Find the CV chunks most similar to a job description
+
+    Returns:
+        {"chunks": [{"text", "section", "cv_id", "score"}, ...]}
+    """
+    if not jd_text or not jd_text.strip():
+        raise ValueError("Job description cannot be empty")
+
+    matches = query_similar(embed_text(jd_text), top_k=top_k)
+    chunks = []
+    for match in matches:
+        metadata = match.get("metadata", {})
+        chunks.append({
+            "text": metadata.get("raw_text", ""),
+            "section": metadata.get("section", ""),
+            "cv_id": metadata.get("cv_id", ""),
+            "score": match.get("score", 0.0),
+        })
+    return {"chunks": chunks}
+
+
+def search_top_k_cvs(jd_text: str, top_k: int = 3) -> dict:
+    """
+    Find the CVs most similar to a job description
+
+    Queries a wider pool of chunks, aggregates the best chunk score per
+    CV, and returns the top_k CVs by that score.
+
+    Returns:
+        {"results": [{"cv_id", "score"}, ...]}
+    """
+    if not jd_text or not jd_text.strip():
+        raise ValueError("Job description cannot be empty")
+
+    # A CV is represented by many chunks; pull enough matches that
+    # several distinct CVs appear even when one CV dominates the top hits
+    matches = query_similar(embed_text(jd_text), top_k=top_k * 10)
+    best = {}
+    for match in matches:
+        cv_id = match.get("metadata", {}).get("cv_id")
+        if not cv_id:
+            continue
+        score = match.get("score", 0.0)
+        if score > best.get(cv_id, 0.0):
+            best[cv_id] = score
+
+    ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+    return {"results": [{"cv_id": cv_id, "score": score}
+                        for cv_id, score in ranked[:top_k]]}
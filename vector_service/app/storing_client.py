@@ -2,7 +2,7 @@
 # VectorService uses this to fetch CV data for embedding
 #
 # Internal API calls:
-# - getCV(cv_id) -> structured_json
+# - get_cv(cv_id) -> full CV document
 #
 # Usage:
 # - Called by mq_consumer.py when processing cv.created event
@@ -13,3 +13,57 @@
 # - Handle connection errors and retries (critical for async processing)
 # - Parse responses
 
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+import orjson
+
+STORING_SERVICE_URL = os.getenv("STORING_SERVICE_URL", "http://localhost:8001")
+
+# Sized for the consumer worker pool: every worker can hold a connection
+# with headroom, and keep-alives avoid a TCP handshake per fetched CV
+_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=16)
+
+# Shared pooled client, created lazily; httpx.Client is thread-safe, so
+# one instance serves all consumer workers
+_client: Optional[httpx.Client] = None
+
+
+class StoringClientError(Exception):
+    """Custom exception for StoringService errors."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        # HTTP status from StoringService, None for connection errors;
+        # lets callers tell permanent failures (4xx) from transient ones
+        self.status_code = status_code
+
+
+def get_client() -> httpx.Client:
+    """Return the shared client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            base_url=STORING_SERVICE_URL, timeout=10.0, limits=_LIMITS
+        )
+    return _client
+
+
+def get_cv(cv_id: str) -> Dict[str, Any]:
+    """
+    Fetch a CV document by id.
+    Internal endpoint: GET /internal/get_cv/{cv_id}
+    """
+    try:
+        resp = get_client().get(f"/internal/get_cv/{cv_id}")
+    except httpx.RequestError as exc:
+        raise StoringClientError(f"Error connecting to StoringService: {exc}") from exc
+    if resp.status_code >= 400:
+        raise StoringClientError(
+            f"StoringService returned {resp.status_code}: {resp.text}",
+            status_code=resp.status_code,
+        )
+    # orjson over raw bytes: structured_sections runs deep (hundreds of
+    # nested bullets) and stdlib json shows up on profiles there
+    return orjson.loads(resp.content)